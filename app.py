@@ -1,11 +1,20 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, Response
+from brotli_asgi import BrotliMiddleware
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
-from impact_analyzer.analyzer import analyze_change_request
-from pydantic import BaseModel
-from typing import Any, Dict
+from impact_analyzer.domain import INSURANCE_CATALOG
+from impact_analyzer.history_store import MAX_ID, MAX_TIMESTAMP, HistoryStore
+from impact_analyzer.job_queue import JobQueue
+from impact_analyzer.metrics import render_metrics
+from prometheus_client import CONTENT_TYPE_LATEST
+from pydantic import BaseModel, HttpUrl
+from typing import Any, Dict, Optional
+import orjson
 import os
 import logging
+import threading
 import uuid
 
 # Setup logging
@@ -18,8 +27,31 @@ GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")  # ✅ Fixed typo from GENIMI to GE
 if not GEMINI_API_KEY:
     logging.warning("⚠️ GEMINI_API_KEY is not set. Check your .env file.")
 
+# "gemini" for the real models, "fake" for the offline backends in impact_analyzer.fakes
+LLM_BACKEND = os.getenv("LLM_BACKEND", "gemini")
+
+# Load the analyzer in the background at startup instead of on the first request.
+# When off, /readyz reports ready at once and the first request loads the analyzer.
+WARMUP_ON_STARTUP = os.getenv("WARMUP_ON_STARTUP", "1") == "1"
+
+# Persistent store for analysis results
+HISTORY_DB_PATH = os.getenv("HISTORY_DB_PATH", "analysis_history.db")
+history_store = HistoryStore(HISTORY_DB_PATH)
+
+
+# Start the job workers (and the analyzer warm-up) with the app, stop the workers
+# on shutdown; job_queue and warm_up_analyzer are defined below
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    job_queue.start()
+    if WARMUP_ON_STARTUP:
+        threading.Thread(target=warm_up_analyzer, name="analyzer-warmup", daemon=True).start()
+    yield
+    job_queue.stop()
+
+
 # Initialize FastAPI app
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # Enable CORS for frontend access
 app.add_middleware(
@@ -30,19 +62,101 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Request model
+# Compress larger responses with brotli, or gzip for clients that don't accept br
+app.add_middleware(BrotliMiddleware, minimum_size=1000, gzip_fallback=True)
+
+def json_response(payload: Any, status_code: int = 200) -> Response:
+    # Serialized with orjson and returned as-is, so FastAPI skips validating and re-encoding it
+    return Response(orjson.dumps(payload), status_code=status_code, media_type="application/json")
+
+
+# Request models
 class ChangeRequest(BaseModel):
     change_text: str
 
-# API endpoint
+
+class JobRequest(BaseModel):
+    change_text: str
+    callback_url: Optional[HttpUrl] = None
+
+
+# Readiness state, set once the analyzer (and with it the models and index) is loaded
+analyzer_ready = threading.Event()
+warmup_error: Optional[str] = None
+
+
+def run_analysis(change_request_id: str, change_text: str, compact: bool = False) -> Dict[str, Any]:
+    # Imported lazily (langchain, Gemini clients, FAISS) so the process starts,
+    # and answers health checks, before the models are loaded
+    from impact_analyzer.analyzer import analyze_change_request
+
+    # Call analyze_change_request with the given ID and API key
+    result = analyze_change_request(change_request_id, change_text, GEMINI_API_KEY, LLM_BACKEND, compact)
+    analyzer_ready.set()
+
+    logging.info(f"✅ Analysis completed: {change_request_id}")
+    logging.debug("Analysis result: %s", result)
+
+    try:
+        history_store.save(change_text, result)
+    except Exception:
+        logging.exception("⚠️ Failed to store analysis result in history:")
+
+    return result
+
+
+# Background job queue; jobs reuse their job id as the change request id
+JOB_DB_PATH = os.getenv("JOB_DB_PATH", "analysis_jobs.db")
+# Worker threads per process: under gunicorn every worker runs its own pool, so the
+# deployment runs WEB_CONCURRENCY x JOB_WORKERS jobs (and LLM calls) at once
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+# Comma-separated hosts callbacks may target ("*.example.com" allowed); when unset,
+# any host resolving only to public addresses is accepted
+CALLBACK_ALLOWED_HOSTS = [h for h in os.getenv("CALLBACK_ALLOWED_HOSTS", "").split(",") if h.strip()]
+job_queue = JobQueue(run_analysis, db_path=JOB_DB_PATH, workers=JOB_WORKERS,
+                     callback_allowed_hosts=CALLBACK_ALLOWED_HOSTS)
+
+
+def warm_up_analyzer():
+    global warmup_error
+    try:
+        from impact_analyzer.analyzer import get_analyzer
+
+        get_analyzer(GEMINI_API_KEY, LLM_BACKEND)
+        analyzer_ready.set()
+        logging.info("🚀 Analyzer loaded, ready for requests")
+    except Exception as e:
+        warmup_error = str(e)
+        logging.exception("🔥 Failed to load analyzer:")
+
+
+# Health endpoints
+@app.get("/healthz")
+async def liveness() -> Response:
+    return json_response({"status": "ok"})
+
+
+@app.get("/readyz")
+async def readiness() -> Response:
+    if WARMUP_ON_STARTUP and not analyzer_ready.is_set():
+        detail = f"Analyzer failed to load: {warmup_error}" if warmup_error else "Analyzer is loading."
+        raise HTTPException(status_code=503, detail=detail)
+    return json_response({"status": "ready"})
+
+
+# API endpoint. Plain def, like every handler that does blocking work (LLM calls,
+# SQLite), so it runs in the threadpool and /healthz keeps answering meanwhile.
 @app.post("/analyze")
-async def analyze(request: ChangeRequest) -> Dict[str, Any]:
+def analyze(
+    request: ChangeRequest,
+    compact: bool = Query(False, description="Reference domain entities by id and catalog version"),
+) -> Response:
     change_text = request.change_text.strip()
 
     if not change_text:
         raise HTTPException(status_code=400, detail="No change description provided.")
 
-    if not GEMINI_API_KEY:
+    if not GEMINI_API_KEY and LLM_BACKEND != "fake":
         raise HTTPException(status_code=500, detail="GEMINI_API_KEY is not configured.")
 
     try:
@@ -52,12 +166,110 @@ async def analyze(request: ChangeRequest) -> Dict[str, Any]:
         # Generate a unique ID for this change request
         change_request_id = str(uuid.uuid4())
 
-        # Call analyze_change_request with the generated ID and API key
-        result = analyze_change_request(change_request_id, change_text, GEMINI_API_KEY)
-
-        logging.info(f"✅ Analysis result: {result}")
-        return result
+        return json_response(run_analysis(change_request_id, change_text, compact))
 
     except Exception as e:
         logging.exception("🔥 Exception occurred while analyzing request:")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
+# Domain catalog referenced by compact analysis responses
+@app.get("/catalog")
+async def catalog(version: Optional[str] = None) -> Response:
+    if version and version != INSURANCE_CATALOG.version:
+        raise HTTPException(status_code=404, detail=f"Catalog version '{version}' is not available.")
+    return json_response(INSURANCE_CATALOG.to_dict())
+
+
+# Prometheus metrics, summed over all gunicorn workers (plain def: reads the
+# per-worker sample files from PROMETHEUS_MULTIPROC_DIR)
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics() -> PlainTextResponse:
+    return PlainTextResponse(render_metrics(), media_type=CONTENT_TYPE_LATEST)
+
+
+# Async job endpoints
+@app.post("/jobs", status_code=202)
+def submit_job(request: JobRequest) -> Response:
+    change_text = request.change_text.strip()
+
+    if not change_text:
+        raise HTTPException(status_code=400, detail="No change description provided.")
+
+    if not GEMINI_API_KEY and LLM_BACKEND != "fake":
+        raise HTTPException(status_code=500, detail="GEMINI_API_KEY is not configured.")
+
+    try:
+        job_id = job_queue.submit(change_text, str(request.callback_url) if request.callback_url else None)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    logging.info(f"📥 Queued analysis job {job_id}")
+    return json_response({"job_id": job_id, "status": "queued"}, status_code=202)
+
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str) -> Response:
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return json_response(job)
+
+
+# History endpoints
+@app.get("/history")
+def list_history(
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[int] = Query(None, ge=1, le=MAX_ID, description="Return analyses older than this id"),
+    entity: Optional[str] = None,
+    relationship: Optional[str] = None,
+    security_risk: Optional[str] = None,
+    compliance_risk: Optional[str] = None,
+    since: Optional[float] = Query(
+        None, ge=0, le=MAX_TIMESTAMP, allow_inf_nan=False, description="Unix timestamp, inclusive"
+    ),
+    until: Optional[float] = Query(
+        None, ge=0, le=MAX_TIMESTAMP, allow_inf_nan=False, description="Unix timestamp, exclusive"
+    ),
+) -> Response:
+    try:
+        page = history_store.list_analyses(
+            limit=limit, before_id=cursor, entity=entity, relationship=relationship,
+            security_risk=security_risk, compliance_risk=compliance_risk, since=since, until=until,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return json_response(page)
+
+
+@app.get("/history/aggregate")
+def aggregate_history(
+    group_by: str = Query(..., description="security_risk, compliance_risk, latency_impact, entity or relationship"),
+    limit: int = Query(100, ge=1, le=1000),
+    entity: Optional[str] = None,
+    relationship: Optional[str] = None,
+    security_risk: Optional[str] = None,
+    compliance_risk: Optional[str] = None,
+    since: Optional[float] = Query(
+        None, ge=0, le=MAX_TIMESTAMP, allow_inf_nan=False,
+        description="Unix timestamp, inclusive. Required when filtering by entity, relationship or risk",
+    ),
+    until: Optional[float] = Query(
+        None, ge=0, le=MAX_TIMESTAMP, allow_inf_nan=False, description="Unix timestamp, exclusive"
+    ),
+) -> Response:
+    try:
+        groups = history_store.aggregate(
+            group_by, limit=limit, entity=entity, relationship=relationship,
+            security_risk=security_risk, compliance_risk=compliance_risk, since=since, until=until,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return json_response({"group_by": group_by, "since": since, "until": until, "groups": groups})
+
+
+@app.get("/history/{change_request_id}")
+def get_history(change_request_id: str) -> Response:
+    result = history_store.get(change_request_id)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Analysis not found.")
+    return json_response(result)
@@ -0,0 +1,77 @@
+"""
+Micro-benchmarks for SystemImpactAnalyzer using the offline fake backends.
+
+Covers entity and relationship matching, context retrieval over the real FAISS
+index (with hash-based query embeddings), chain output parsing (bare and
+fenced JSON), and a full
+analyze() run with zero-latency fake LLM calls. No Gemini key is needed.
+
+Usage:
+    python benchmarks/bench_analyzer.py
+    python benchmarks/bench_analyzer.py --save-baseline
+    python benchmarks/bench_analyzer.py --check --tolerance 0.25
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import check_baselines, latency_stats, print_table, save_baselines  # noqa: E402
+from impact_analyzer.analyzer import SystemImpactAnalyzer  # noqa: E402
+from impact_analyzer.fakes import FakeChatModel, FakeEmbeddings  # noqa: E402
+
+CHANGE_TEXT = (
+    "Add a claim_channel field to Claim so adjusters can see whether the claim was filed "
+    "online or through an agent, and expose it on the policy_number lookup API."
+)
+
+
+def measure(fn, iterations: int, warmup: int = 10):
+    for _ in range(warmup):
+        fn()
+    durations = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        durations.append(time.perf_counter() - start)
+    stats = latency_stats(durations)
+    stats["ops_per_sec"] = iterations / sum(durations)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--check", action="store_true", help="Exit non-zero if a baseline regressed")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    analyzer = SystemImpactAnalyzer(None, llm=FakeChatModel(seed=0), embeddings=FakeEmbeddings(seed=0))
+    entities = analyzer.find_impacted_entities(CHANGE_TEXT)
+    inputs = {"change_desc": CHANGE_TEXT, "context": analyzer.faiss_store.retrieve_context(CHANGE_TEXT)}
+    chain_output = analyzer.invoke_chain("functional", analyzer.functional_chain, inputs)
+    fenced_output = {"text": f"Here is the analysis:\n```json\n{chain_output['text']}\n```"}
+    n = args.iterations
+
+    results = {
+        "find_impacted_entities": measure(lambda: analyzer.find_impacted_entities(CHANGE_TEXT), n),
+        "find_impacted_relationships": measure(lambda: analyzer.find_impacted_relationships(entities), n),
+        "retrieve_context": measure(lambda: analyzer.faiss_store.retrieve_context(CHANGE_TEXT), n),
+        "json_parse": measure(lambda: analyzer.parse_chain_output("functional", chain_output), n),
+        "json_parse_fenced": measure(lambda: analyzer.parse_chain_output("functional", fenced_output), n),
+        "analyze_fake_llm": measure(lambda: analyzer.analyze("bench", CHANGE_TEXT), max(1, n // 20)),
+        "analyze_fake_llm_compact": measure(lambda: analyzer.analyze("bench", CHANGE_TEXT, compact=True), max(1, n // 20)),
+    }
+    print_table(results)
+
+    if args.save_baseline:
+        save_baselines(results)
+    if args.check and not check_baselines(results, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Cold-start budget for the API process.
+
+Imports app.py in fresh interpreters, then starts the real deployment (gunicorn
+with gunicorn.conf.py) and times how long it takes until /healthz first returns
+200. Fails (exit code 1) if either median exceeds its budget, or if any heavy
+module that should load lazily (langchain, Gemini clients, FAISS) was pulled in
+at import time. Run it in CI to catch cold-start regressions.
+
+Usage:
+    python benchmarks/bench_import.py
+    python benchmarks/bench_import.py --budget-ms 800 --startup-budget-ms 2500 --runs 7
+    GUNICORN_PRELOAD=1 python benchmarks/bench_import.py --startup-budget-ms 15000
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.common import gunicorn_server  # noqa: E402
+
+# Top-level packages that must not be imported just by loading app.py.
+LAZY_MODULES = [
+    "langchain", "langchain_core", "langchain_community", "langchain_google_genai",
+    "faiss", "numpy", "requests",
+]
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import app
+elapsed = time.perf_counter() - start
+print(json.dumps({"ms": elapsed * 1000, "modules": sorted({m.split(".")[0] for m in sys.modules})}))
+"""
+
+
+def measure_once():
+    env = {**os.environ, "WARMUP_ON_STARTUP": "0"}
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE], cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def measure_startup_once(workers: int) -> float:
+    """Milliseconds from launching gunicorn until GET /healthz returns 200."""
+    with gunicorn_server(workers) as server:
+        return server["startup_ms"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv("IMPORT_BUDGET_MS", "1000")))
+    parser.add_argument("--startup-budget-ms", type=float, default=float(os.getenv("STARTUP_BUDGET_MS", "3000")),
+                        help="Budget from gunicorn start to the first /healthz 200")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", "2")))
+    args = parser.parse_args()
+
+    runs = [measure_once() for _ in range(args.runs)]
+    median_ms = statistics.median(r["ms"] for r in runs)
+    eager = sorted(set(LAZY_MODULES) & set(runs[-1]["modules"]))
+
+    startup_ms = statistics.median(measure_startup_once(args.workers) for _ in range(args.runs))
+
+    print(f"import app: median {median_ms:.1f} ms over {args.runs} runs (budget {args.budget_ms:.0f} ms)")
+    print(
+        f"gunicorn start -> /healthz 200 ({args.workers} workers): median {startup_ms:.1f} ms "
+        f"over {args.runs} runs (budget {args.startup_budget_ms:.0f} ms)"
+    )
+    ok = True
+    if median_ms > args.budget_ms:
+        ok = False
+        print(f"❌ Import time over budget by {median_ms - args.budget_ms:.1f} ms")
+    if startup_ms > args.startup_budget_ms:
+        ok = False
+        print(f"❌ Startup time over budget by {startup_ms - args.startup_budget_ms:.1f} ms")
+    if eager:
+        ok = False
+        print(f"❌ Heavy modules imported eagerly: {', '.join(eager)}")
+    if ok:
+        print("✅ Import and startup time within budget")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
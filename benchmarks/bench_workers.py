@@ -0,0 +1,126 @@
+"""
+Throughput and memory scaling of the real deployment across gunicorn worker counts.
+
+For each worker count, starts gunicorn with gunicorn.conf.py against the fake
+LLM/embedding backends (LLM_BACKEND=fake, so no Gemini spend), warms every worker
+up, drives POST /analyze with load_test.run at a fixed open-loop rate, and reads
+each worker's memory from /proc/<pid>/smaps_rollup while the server is still up.
+
+PSS splits shared pages (copy-on-write preloaded modules, the memory-mapped FAISS
+index) between the processes sharing them, so the "total pss" column is the real
+memory cost of the deployment; RSS counts shared pages once per worker.
+
+Usage:
+    python benchmarks/bench_workers.py --workers 1 2 4 --rps 200 --duration 10
+    FAKE_LLM_LATENCY_MS=50 python benchmarks/bench_workers.py --workers 1 2 4 --rps 100
+    python benchmarks/bench_workers.py --preload   # GUNICORN_PRELOAD=1
+    python benchmarks/bench_workers.py --save-baseline
+"""
+import argparse
+import os
+import sys
+import time
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import check_baselines, gunicorn_server, save_baselines, wait_for  # noqa: E402
+from benchmarks.load_test import run as run_load  # noqa: E402
+
+
+def _children(pid: int) -> List[int]:
+    children = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # Fields after the parenthesized command name; ppid is the second.
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (FileNotFoundError, ProcessLookupError, IndexError, ValueError):
+            continue
+        if ppid == pid:
+            children.append(int(entry))
+    return children
+
+
+def _memory_kb(pid: int) -> Dict[str, int]:
+    """Return rss, pss and private (clean + dirty) memory in kB for a process, from /proc."""
+    memory = {"rss": 0, "pss": 0, "private": 0}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                key, value = line.split(":", 1)
+                kb = int(value.split()[0])
+                if key == "Rss":
+                    memory["rss"] = kb
+                elif key == "Pss":
+                    memory["pss"] = kb
+                elif key in ("Private_Clean", "Private_Dirty"):
+                    memory["private"] += kb
+    except (FileNotFoundError, PermissionError):
+        pass
+    return memory
+
+
+def run(workers: int, rps: float, duration: float, warmup: float, concurrency: int,
+        timeout: float, preload: bool) -> Dict[str, float]:
+    env = {"LLM_BACKEND": "fake", "GUNICORN_PRELOAD": "1" if preload else "0"}
+    with gunicorn_server(workers, env) as server:
+        wait_for(f"{server['url']}/readyz", timeout)
+        # Warm-up traffic reaches every worker, so each has loaded its analyzer and index.
+        run_load(f"{server['url']}/analyze", rps, warmup, concurrency, timeout)
+        stats = run_load(f"{server['url']}/analyze", rps, duration, concurrency, timeout)
+
+        worker_pids = _children(server["pid"])
+        memory = [_memory_kb(pid) for pid in worker_pids]
+        master = _memory_kb(server["pid"])
+
+    stats.update({
+        "startup_ms": server["startup_ms"],
+        "worker_rss_kb": max(m["rss"] for m in memory),
+        "worker_private_kb": max(m["private"] for m in memory),
+        "total_pss_kb": master["pss"] + sum(m["pss"] for m in memory),
+    })
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--rps", type=float, default=200.0, help="Total target request rate")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--warmup", type=float, default=2.0, help="Seconds of discarded warm-up traffic")
+    parser.add_argument("--concurrency", type=int, default=256, help="Maximum requests in flight")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--preload", action="store_true", help="Start gunicorn with GUNICORN_PRELOAD=1")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--check", action="store_true", help="Exit non-zero if the baseline regressed")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    print(
+        f"{'workers':>7} {'req/s':>8} {'vs first':>8} {'p50 ms':>8} {'p95 ms':>8} {'errors':>7} "
+        f"{'worker rss kB':>14} {'worker private kB':>18} {'total pss kB':>13}"
+    )
+    results = {}
+    base = None
+    for n in args.workers:
+        r = run(n, args.rps, args.duration, args.warmup, args.concurrency, args.timeout, args.preload)
+        base = base or r["throughput_rps"]
+        print(
+            f"{n:>7} {r['throughput_rps']:>8.1f} {r['throughput_rps'] / base:>7.2f}x "
+            f"{r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} {r['error_rate']:>7.1%} "
+            f"{r['worker_rss_kb']:>14} {r['worker_private_kb']:>18} {r['total_pss_kb']:>13}"
+        )
+        results[f"gunicorn_{n}w{'_preload' if args.preload else ''}_{args.rps:g}rps"] = r
+        time.sleep(0.5)
+
+    if args.save_baseline:
+        save_baselines(results)
+    if args.check and not check_baselines(results, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+Shared helpers for the benchmark scripts: latency statistics, baseline checks and
+starting the real gunicorn deployment.
+
+Baselines live in benchmarks/baselines.json, keyed by benchmark name. Record them
+with --save-baseline on a quiet machine and compare later runs with --check. The
+committed file was recorded with `bench_analyzer.py --iterations 500` and the
+`load_test.py --serve 2` example (fake backends, 400 ms mean LLM latency); they
+are hardware-specific, so re-record them on the machine that runs --check.
+"""
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+
+# Metrics where a larger value is better; every other metric is a latency.
+HIGHER_IS_BETTER = {"ops_per_sec", "throughput_rps"}
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return float("nan")
+    rank = (len(sorted_values) - 1) * pct / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (rank - lower)
+
+
+def latency_stats(durations: List[float]) -> Dict[str, float]:
+    """Summarize durations in seconds as p50/p95/p99 in milliseconds."""
+    values = sorted(durations)
+    return {
+        "p50_ms": percentile(values, 50) * 1000,
+        "p95_ms": percentile(values, 95) * 1000,
+        "p99_ms": percentile(values, 99) * 1000,
+    }
+
+
+def load_baselines() -> Dict[str, Dict[str, float]]:
+    if not os.path.exists(BASELINES_PATH):
+        return {}
+    with open(BASELINES_PATH) as f:
+        return json.load(f)
+
+
+def save_baselines(results: Dict[str, Dict[str, float]]):
+    baselines = load_baselines()
+    baselines.update(results)
+    with open(BASELINES_PATH, "w") as f:
+        json.dump(baselines, f, indent=2, sort_keys=True)
+        f.write("\n")
+    print(f"💾 Saved {len(results)} baseline(s) to {BASELINES_PATH}")
+
+
+def check_baselines(results: Dict[str, Dict[str, float]], tolerance: float) -> bool:
+    """
+    Compare results against stored baselines.
+
+    Args:
+        results (dict): Benchmark name -> metric name -> value.
+        tolerance (float): Allowed relative regression, e.g. 0.2 for 20%.
+
+    Returns:
+        bool: True if no metric regressed beyond the tolerance.
+    """
+    baselines = load_baselines()
+    ok = True
+    for name, metrics in results.items():
+        baseline = baselines.get(name)
+        if baseline is None:
+            print(f"⚠️ No baseline for '{name}'")
+            continue
+        for metric, value in metrics.items():
+            expected = baseline.get(metric)
+            if expected is None:
+                continue
+            if metric == "error_rate":
+                # Absolute slack of one percentage point, since the baseline is usually zero.
+                regressed = value > expected + 0.01
+            elif not expected:
+                continue
+            elif metric in HIGHER_IS_BETTER:
+                regressed = value < expected * (1 - tolerance)
+            else:
+                regressed = value > expected * (1 + tolerance)
+            if regressed:
+                ok = False
+                print(f"❌ {name}.{metric}: {value:.3f} vs baseline {expected:.3f}")
+    if ok:
+        print(f"✅ No regressions beyond {tolerance:.0%}")
+    return ok
+
+
+def print_table(results: Dict[str, Dict[str, float]]):
+    columns = ["p50_ms", "p95_ms", "p99_ms", "ops_per_sec", "throughput_rps", "error_rate"]
+    columns = [c for c in columns if any(c in m for m in results.values())]
+    width = max(len(name) for name in [*results, "benchmark"]) + 2
+    print(f"{'benchmark':<{width}}" + "".join(f"{c:>15}" for c in columns))
+    for name, metrics in results.items():
+        cells = "".join(f"{metrics[c]:>15.4f}" if c in metrics else f"{'-':>15}" for c in columns)
+        print(f"{name:<{width}}{cells}")
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for(url: str, timeout: float, proc: Optional[subprocess.Popen] = None):
+    """Poll url until it returns 200, failing early if proc exits."""
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if proc is not None and proc.poll() is not None:
+            raise RuntimeError(f"gunicorn exited with code {proc.returncode}")
+        try:
+            with urllib.request.urlopen(url, timeout=1) as resp:
+                if resp.status == 200:
+                    return
+        except (urllib.error.URLError, ConnectionError, socket.timeout):
+            pass
+        time.sleep(0.02)
+    raise RuntimeError(f"{url} did not return 200 within {timeout:.0f} s")
+
+
+@contextmanager
+def gunicorn_server(workers: int, env: Optional[Dict[str, str]] = None,
+                    timeout: float = 60.0) -> Iterator[Dict[str, object]]:
+    """
+    Start the real deployment (gunicorn with gunicorn.conf.py) on a free port, with
+    throwaway history/job databases, and wait until /healthz returns 200.
+
+    Yields:
+        dict: {"url": base URL, "pid": master pid, "startup_ms": launch to first /healthz 200}
+    """
+    port = _free_port()
+    with tempfile.TemporaryDirectory() as tmp:
+        server_env = {
+            **os.environ,
+            "HISTORY_DB_PATH": os.path.join(tmp, "history.db"),
+            "JOB_DB_PATH": os.path.join(tmp, "jobs.db"),
+            **(env or {}),
+            "PORT": str(port),
+            "WEB_CONCURRENCY": str(workers),
+        }
+        url = f"http://127.0.0.1:{port}"
+        start = time.perf_counter()
+        proc = subprocess.Popen(
+            [sys.executable, "-m", "gunicorn", "app:app", "-c", "gunicorn.conf.py"],
+            cwd=ROOT, env=server_env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            wait_for(f"{url}/healthz", timeout, proc)
+            yield {"url": url, "pid": proc.pid, "startup_ms": (time.perf_counter() - start) * 1000}
+        finally:
+            proc.send_signal(signal.SIGTERM)
+            try:
+                proc.wait(10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
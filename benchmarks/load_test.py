@@ -0,0 +1,100 @@
+"""
+Open-loop load generator for POST /analyze.
+
+Requests are scheduled at a fixed target rate regardless of how fast earlier
+ones complete, and latency is measured from each request's scheduled start, so
+queueing inside the server shows up in the percentiles instead of being hidden.
+
+Run the server against the fake backends to avoid Gemini spend, e.g.:
+    LLM_BACKEND=fake FAKE_LLM_LATENCY_MS=400 FAKE_LLM_LATENCY_STDDEV_MS=150 \\
+        gunicorn app:app -c gunicorn.conf.py
+    python benchmarks/load_test.py --url http://127.0.0.1:8000/analyze --rps 20 --duration 30
+
+or let --serve start that deployment (LLM_BACKEND=fake, FAKE_* from the environment):
+    FAKE_LLM_LATENCY_MS=400 FAKE_LLM_LATENCY_STDDEV_MS=150 FAKE_SEED=1 \\
+        python benchmarks/load_test.py --serve 2 --rps 20 --duration 30 --save-baseline
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import (  # noqa: E402
+    check_baselines, gunicorn_server, latency_stats, print_table, save_baselines, wait_for,
+)
+
+CHANGE_TEXT = "Add a claim_channel field to Claim and expose it on the policy lookup API."
+
+_local = threading.local()
+
+
+def _session() -> requests.Session:
+    if not hasattr(_local, "session"):
+        _local.session = requests.Session()
+    return _local.session
+
+
+def _send(url: str, scheduled: float, timeout: float):
+    time.sleep(max(0.0, scheduled - time.perf_counter()))
+    try:
+        ok = _session().post(url, json={"change_text": CHANGE_TEXT}, timeout=timeout).ok
+    except requests.RequestException:
+        ok = False
+    return time.perf_counter() - scheduled, ok
+
+
+def run(url: str, rps: float, duration: float, concurrency: int, timeout: float):
+    total = int(rps * duration)
+    start = time.perf_counter() + 0.1
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = [pool.submit(_send, url, start + i / rps, timeout) for i in range(total)]
+        outcomes = [f.result() for f in futures]
+    elapsed = time.perf_counter() - start
+
+    latencies = [latency for latency, ok in outcomes if ok]
+    stats = latency_stats(latencies)
+    stats["throughput_rps"] = len(latencies) / elapsed
+    stats["error_rate"] = 1 - len(latencies) / total if total else 0.0
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8000/analyze")
+    parser.add_argument("--serve", type=int, metavar="WORKERS",
+                        help="Start gunicorn with the fake backends and this many workers instead of using --url")
+    parser.add_argument("--rps", type=float, default=10.0)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--concurrency", type=int, default=256, help="Maximum requests in flight")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--name", default=None, help="Baseline key; defaults to load_<rps>rps")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--check", action="store_true", help="Exit non-zero if the baseline regressed")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    name = args.name or f"load_{args.rps:g}rps"
+    if args.serve:
+        with gunicorn_server(args.serve, {"LLM_BACKEND": "fake"}) as server:
+            wait_for(f"{server['url']}/readyz", args.timeout)
+            url = f"{server['url']}/analyze"
+            run(url, args.rps, min(args.duration, 2.0), args.concurrency, args.timeout)  # warm up every worker
+            results = {name: run(url, args.rps, args.duration, args.concurrency, args.timeout)}
+    else:
+        results = {name: run(args.url, args.rps, args.duration, args.concurrency, args.timeout)}
+    print_table(results)
+
+    if args.save_baseline:
+        save_baselines(results)
+    if args.check and not check_baselines(results, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# Multi-worker deployment: gunicorn pre-forks uvicorn workers.
+#
+# The master only builds the domain catalog (impact_analyzer.domain, no heavy
+# dependencies) before forking, so workers share it copy-on-write. Workers import
+# the app and load the FAISS index themselves, so the master binds and forks in
+# well under a second and every worker answers /healthz before the models are
+# loaded (see WARMUP_ON_STARTUP in app.py). The index vectors are memory-mapped
+# read-only, so workers share them through the page cache anyway; only the
+# unpickled docstore and the imported libraries are per worker.
+#
+# GUNICORN_PRELOAD=1 instead imports the app and loads the index/docstore once in
+# the master before forking, so workers share those pages copy-on-write too. This
+# trades a slower start (langchain, Gemini clients and FAISS are imported before
+# any worker binds) for lower memory per worker; benchmarks/bench_workers.py
+# measures both.
+#
+# LLM/embedding clients and SQLite connections are created lazily inside each
+# worker, since neither gRPC channels nor SQLite handles survive a fork.
+#
+# Metrics use prometheus_client's multiprocess mode: each worker writes its
+# samples under PROMETHEUS_MULTIPROC_DIR and /metrics on any worker reports the
+# totals across all of them, so a single scrape target covers the deployment.
+import gc
+import glob
+import os
+import tempfile
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = os.getenv("GUNICORN_PRELOAD", "0") == "1"
+timeout = int(os.getenv("WORKER_TIMEOUT", "120"))
+
+# Set before any worker imports prometheus_client, which reads it at import time.
+if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="impact-analyzer-metrics-")
+
+
+def on_starting(server):
+    # Samples left by a previous run would be added to this run's totals.
+    os.makedirs(os.environ["PROMETHEUS_MULTIPROC_DIR"], exist_ok=True)
+    for path in glob.glob(os.path.join(os.environ["PROMETHEUS_MULTIPROC_DIR"], "*.db")):
+        os.remove(path)
+
+    from impact_analyzer.domain import INSURANCE_CATALOG
+
+    server.log.info(f"📚 Built domain catalog {INSURANCE_CATALOG.version} before forking workers")
+    if not preload_app:
+        return
+
+    from impact_analyzer.faiss_store import DEFAULT_INDEX_PATH, load_index
+
+    load_index(DEFAULT_INDEX_PATH)
+    server.log.info(f"📦 Preloaded FAISS index from '{DEFAULT_INDEX_PATH}' before forking workers")
+
+
+def pre_fork(server, worker):
+    # Move everything loaded so far into the permanent generation so the
+    # cyclic GC in the workers does not touch (and un-share) those pages.
+    gc.freeze()
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
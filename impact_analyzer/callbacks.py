@@ -0,0 +1,21 @@
+from langchain_core.callbacks import BaseCallbackHandler
+
+from impact_analyzer.metrics import LLM_TOKENS_TOTAL
+
+
+class TokenUsageHandler(BaseCallbackHandler):
+    """
+    LangChain callback that counts the tokens reported by the LLM for one chain.
+    """
+
+    def __init__(self, chain: str):
+        self.chain = chain
+
+    def on_llm_end(self, response, **kwargs):
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+                if usage.get("input_tokens"):
+                    LLM_TOKENS_TOTAL.labels(chain=self.chain, direction="input").inc(usage["input_tokens"])
+                if usage.get("output_tokens"):
+                    LLM_TOKENS_TOTAL.labels(chain=self.chain, direction="output").inc(usage["output_tokens"])
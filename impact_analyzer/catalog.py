@@ -0,0 +1,142 @@
+import hashlib
+import json
+import sys
+from typing import Any, Dict, Iterable, List, NamedTuple, Tuple
+
+
+class Entity(NamedTuple):
+    id: str
+    type: str
+    name: str
+    description: str
+    attributes: Tuple[str, ...]
+    owner: str
+    impact_dimensions: Tuple[Tuple[str, Tuple[str, ...]], ...]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "type": self.type,
+            "name": self.name,
+            "description": self.description,
+            "attributes": list(self.attributes),
+            "owner": self.owner,
+            "impact_dimensions": {dim: list(values) for dim, values in self.impact_dimensions},
+        }
+
+
+class Relationship(NamedTuple):
+    source: str
+    target: str
+    type: str
+    direction: str
+    description: str
+    attributes: Tuple[str, ...]
+    business_rules: Tuple[str, ...]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "source": self.source,
+            "target": self.target,
+            "type": self.type,
+            "direction": self.direction,
+            "description": self.description,
+            "attributes": list(self.attributes),
+            "business_rules": list(self.business_rules),
+        }
+
+
+def _names(values: Iterable[str]) -> Tuple[str, ...]:
+    return tuple(sys.intern(v) for v in values)
+
+
+def _entity(data: Dict[str, Any]) -> Entity:
+    return Entity(
+        id=sys.intern(data["id"]),
+        type=sys.intern(data.get("type", "")),
+        name=sys.intern(data["name"]),
+        description=data.get("description", ""),
+        attributes=_names(data.get("attributes", [])),
+        owner=sys.intern(data.get("owner", "")),
+        impact_dimensions=tuple(
+            (sys.intern(dim), _names(values)) for dim, values in data.get("impact_dimensions", {}).items()
+        ),
+    )
+
+
+def _relationship(data: Dict[str, Any]) -> Relationship:
+    return Relationship(
+        source=sys.intern(data["source"]),
+        target=sys.intern(data["target"]),
+        type=sys.intern(data["type"]),
+        direction=sys.intern(data.get("direction", "")),
+        description=data.get("description", ""),
+        attributes=_names(data.get("attributes", [])),
+        business_rules=tuple(data.get("business_rules", [])),
+    )
+
+
+class Catalog:
+    """
+    Immutable, indexed view of the domain entities and relationships.
+
+    Built once per process and shared by every analyzer. Records are NamedTuples
+    with interned names and are the only copy of the data kept: their dict form
+    is built on demand when a response needs it and freed with the response.
+    """
+
+    def __init__(self, entities: List[Dict[str, Any]], relationships: List[Dict[str, Any]]):
+        self.entities = tuple(_entity(e) for e in entities)
+        self.relationships = tuple(_relationship(r) for r in relationships)
+
+        self.entity_by_id = {e.id: e for e in self.entities}
+        self.relationships_by_type: Dict[str, Tuple[Relationship, ...]] = {}
+        by_entity: Dict[str, List[Relationship]] = {}
+        for rel in self.relationships:
+            self.relationships_by_type[rel.type] = self.relationships_by_type.get(rel.type, ()) + (rel,)
+            by_entity.setdefault(rel.source, []).append(rel)
+            if rel.target != rel.source:
+                by_entity.setdefault(rel.target, []).append(rel)
+        self.relationships_by_entity = {k: tuple(v) for k, v in by_entity.items()}
+
+        # Lower-cased match keywords per entity, in catalog order
+        self.entity_keywords = tuple(
+            (e.id, tuple({e.name.lower(), *(a.lower() for a in e.attributes), e.description.lower()}))
+            for e in self.entities
+        )
+
+        canonical = json.dumps(self._records(), sort_keys=True, separators=(",", ":"))
+        self.version = hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:12]
+
+    def find_entities(self, text: str) -> List[str]:
+        """Ids of entities whose name, attributes or description appear in the text."""
+        text_lower = text.lower()
+        return [
+            entity_id for entity_id, keywords in self.entity_keywords
+            if any(keyword in text_lower for keyword in keywords)
+        ]
+
+    def find_relationships(self, entity_ids: Iterable[str]) -> List[str]:
+        """Types of relationships with an impacted entity at either end."""
+        types = {}
+        for entity_id in entity_ids:
+            for rel in self.relationships_by_entity.get(entity_id, ()):
+                types[rel.type] = None
+        return list(types)
+
+    def entity_dicts(self, entity_ids: Iterable[str]) -> List[Dict[str, Any]]:
+        """Serialized entities, in the given order."""
+        return [self.entity_by_id[entity_id].to_dict() for entity_id in entity_ids]
+
+    def relationship_dicts(self, rel_types: Iterable[str]) -> List[Dict[str, Any]]:
+        """Serialized relationships of the given types."""
+        return [r.to_dict() for rel_type in rel_types for r in self.relationships_by_type.get(rel_type, ())]
+
+    def _records(self) -> Dict[str, Any]:
+        return {
+            "entities": [e.to_dict() for e in self.entities],
+            "relationships": [r.to_dict() for r in self.relationships],
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"version": self.version, **self._records()}
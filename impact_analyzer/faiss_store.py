@@ -1,15 +1,81 @@
+from functools import lru_cache
 from langchain_community.vectorstores import FAISS
 from langchain_google_genai import GoogleGenerativeAIEmbeddings
+import faiss
 import os
+import pickle
+import threading
+
+from impact_analyzer.metrics import timed
+
+DEFAULT_INDEX_PATH = "faiss_index_dir"
+
+
+# Serializes first loads; lru_cache alone lets concurrent misses each load a copy.
+_load_lock = threading.Lock()
+
+
+def load_index(index_path: str = DEFAULT_INDEX_PATH, mmap: bool = True):
+    """
+    Load the raw FAISS index and docstore once per process.
+
+    With mmap, the index is opened with IO_FLAG_MMAP_IFC (faiss-cpu >= 1.11), which
+    memory-maps the stored vectors of flat and IVF indexes read-only instead of
+    copying them onto the heap. Those pages live in the OS page cache and are shared
+    by every worker process that maps the same file, whether or not it was loaded
+    before forking. The docstore is unpickled into each process's own heap; it is
+    shared copy-on-write only when loaded before forking (GUNICORN_PRELOAD=1).
+
+    Args:
+        index_path (str): Directory path where the FAISS index is stored.
+        mmap (bool): Memory-map the index vectors read-only instead of reading them into memory.
+
+    Returns:
+        tuple: (faiss index, docstore, index_to_docstore_id)
+
+    Raises:
+        FileNotFoundError: If index_path does not exist.
+        RuntimeError: If loading the index fails.
+    """
+    with _load_lock:
+        return _load_index(index_path, mmap)
+
+
+@lru_cache(maxsize=None)
+def _load_index(index_path: str, mmap: bool):
+    if not os.path.exists(index_path):
+        raise FileNotFoundError(
+            f"FAISS index directory '{index_path}' not found. "
+            "Please create or load the index first."
+        )
+
+    index_file = os.path.join(index_path, "index.faiss")
+    try:
+        if mmap:
+            try:
+                index = faiss.read_index(index_file, faiss.IO_FLAG_MMAP_IFC | faiss.IO_FLAG_READ_ONLY)
+            except RuntimeError:
+                # Not every index type supports memory mapping; fall back to a regular read.
+                index = faiss.read_index(index_file)
+        else:
+            index = faiss.read_index(index_file)
+
+        with open(os.path.join(index_path, "index.pkl"), "rb") as f:
+            docstore, index_to_docstore_id = pickle.load(f)  # ✅ Trusted, locally created index
+    except Exception as e:
+        raise RuntimeError(f"Failed to load FAISS index from '{index_path}': {e}")
+
+    return index, docstore, index_to_docstore_id
 
 
 class FaissStore:
-    def __init__(self, index_path: str = "faiss_index_dir"):    
+    def __init__(self, index_path: str = DEFAULT_INDEX_PATH, embeddings=None):    
         """
-        Initialize FaissStore by loading an existing FAISS index.
+        Initialize FaissStore on top of the process-wide FAISS index.
         
         Args:
             index_path (str): Directory path where the FAISS index is stored.
+            embeddings: Embeddings backend; defaults to the Gemini embedding model.
         
         Raises:
             FileNotFoundError: If index_path does not exist.
@@ -18,25 +84,16 @@ class FaissStore:
         self.index_path = index_path
         self.faiss_index = None
         
-        try:
-            self.embeddings = GoogleGenerativeAIEmbeddings(model="models/embedding-001")  # Gemini embedding model
-        except Exception as e:
-            raise RuntimeError(f"Failed to initialize embeddings: {e}")
-        
-        if os.path.exists(self.index_path):
+        if embeddings is not None:
+            self.embeddings = embeddings
+        else:
             try:
-                self.faiss_index = FAISS.load_local(
-                    self.index_path,
-                    self.embeddings,
-                    allow_dangerous_deserialization=True  # ✅ Required for loading index.pkl
-                )
+                self.embeddings = GoogleGenerativeAIEmbeddings(model="models/embedding-001")  # Gemini embedding model
             except Exception as e:
-                raise RuntimeError(f"Failed to load FAISS index from '{self.index_path}': {e}")
-        else:
-            raise FileNotFoundError(
-                f"FAISS index directory '{self.index_path}' not found. "
-                "Please create or load the index first."
-            )
+                raise RuntimeError(f"Failed to initialize embeddings: {e}")
+        
+        index, docstore, index_to_docstore_id = load_index(self.index_path)
+        self.faiss_index = FAISS(self.embeddings, index, docstore, index_to_docstore_id)
     
     def retrieve_context(self, query: str, k: int = 3) -> str:
         """
@@ -52,7 +109,10 @@ class FaissStore:
         if not self.faiss_index:
             raise RuntimeError("FAISS index is not loaded.")
         
-        docs = self.faiss_index.similarity_search(query, k=k)
+        with timed("query_embedding"):
+            embedding = self.embeddings.embed_query(query)
+        with timed("faiss_search"):
+            docs = self.faiss_index.similarity_search_by_vector(embedding, k=k)
         if not docs:
             return ""
         
@@ -0,0 +1,195 @@
+"""
+Offline stand-ins for ChatGoogleGenerativeAI and GoogleGenerativeAIEmbeddings.
+
+They let SystemImpactAnalyzer and /analyze run without a Gemini key, with
+configurable latency, injected errors and canned JSON outputs, so throughput can
+be measured without real spend. Enable them in the app with LLM_BACKEND=fake.
+"""
+import hashlib
+import json
+import math
+import os
+import random
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from pydantic import PrivateAttr
+
+
+# Text that identifies which dimension prompt a chain sent (see impact_analyzer.prompts).
+PROMPT_MARKERS = [
+    ("functional", "functional impacts"),
+    ("data", "data impact assessor"),
+    ("api", "Analyze API changes"),
+    ("ui", "Analyze UI/UX impacts"),
+    ("compliance", "Analyze compliance impact"),
+    ("security", "Analyze security risks"),
+    ("performance", "Analyze performance impact"),
+]
+
+DEFAULT_RESPONSES = {
+    "functional": {"rules_changed": 2, "description": "Validation rules for claims intake change."},
+    "data": {"fields_added": 1, "fields_modified": 0, "details": "Adds a claim_channel field to Claim."},
+    "api": {"endpoints_modified": 2, "endpoints_added": 1, "description": "Claim submission endpoints change."},
+    "ui": {"screens_affected": 1, "components_changed": 3, "summary": "Claim form gains a channel selector."},
+    "compliance": {"compliance_flags": ["GDPR data retention"], "risk_level": "Medium",
+                   "details": "New personal data field requires a retention review."},
+    "security": {"risk_level": "Low", "vulnerabilities_introduced": False,
+                 "description": "Input is validated server-side."},
+    "performance": {"latency_impact": "Minor increase", "throughput_impact": "No change",
+                    "summary": "One extra validation step per claim."},
+}
+
+
+def sample_latency(rng: random.Random, distribution: str, mean: float, stddev: float) -> float:
+    """
+    Draw a latency in seconds from the named distribution.
+
+    Args:
+        rng (random.Random): Source of randomness.
+        distribution (str): "constant", "uniform", "normal" or "lognormal".
+        mean (float): Mean latency in seconds.
+        stddev (float): Standard deviation in seconds (half-width for "uniform").
+
+    Returns:
+        float: A non-negative latency in seconds.
+    """
+    if mean <= 0:
+        return 0.0
+    if distribution == "constant" or stddev <= 0:
+        return mean
+    if distribution == "uniform":
+        return max(0.0, rng.uniform(mean - stddev, mean + stddev))
+    if distribution == "normal":
+        return max(0.0, rng.gauss(mean, stddev))
+    if distribution == "lognormal":
+        # Parameters of the underlying normal that give the requested mean/stddev.
+        sigma2 = math.log(1 + (stddev / mean) ** 2)
+        return rng.lognormvariate(math.log(mean) - sigma2 / 2, math.sqrt(sigma2))
+    raise ValueError(f"Unknown latency distribution '{distribution}'")
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Chat model that answers each dimension prompt with canned JSON after a simulated delay.
+    """
+
+    responses: Dict[str, Any] = DEFAULT_RESPONSES
+    latency_mean: float = 0.0
+    latency_stddev: float = 0.0
+    latency_distribution: str = "lognormal"
+    error_rate: float = 0.0
+    # Fraction of responses wrapped in a ```json fence, as Gemini often does.
+    fence_rate: float = 0.0
+    seed: Optional[int] = None
+
+    _rng: random.Random = PrivateAttr()
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._rng = random.Random(self.seed)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def _response_for(self, prompt: str) -> str:
+        for dimension, marker in PROMPT_MARKERS:
+            if marker in prompt:
+                response = self.responses.get(dimension, {})
+                break
+        else:
+            response = {}
+        text = response if isinstance(response, str) else json.dumps(response)
+        if self.fence_rate and self._rng.random() < self.fence_rate:
+            text = f"```json\n{text}\n```"
+        return text
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        prompt = "\n".join(str(m.content) for m in messages)
+        time.sleep(sample_latency(self._rng, self.latency_distribution, self.latency_mean, self.latency_stddev))
+        if self.error_rate and self._rng.random() < self.error_rate:
+            raise RuntimeError("Injected fake LLM error")
+
+        text = self._response_for(prompt)
+        # Roughly four characters per token, like the real tokenizer on English text.
+        input_tokens, output_tokens = len(prompt) // 4, len(text) // 4
+        message = AIMessage(
+            content=text,
+            usage_metadata={
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "total_tokens": input_tokens + output_tokens,
+            },
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+class FakeEmbeddings(Embeddings):
+    """
+    Deterministic hash-based embeddings: the same text always maps to the same unit vector.
+    """
+
+    def __init__(self, size: int = 768, latency_mean: float = 0.0, latency_stddev: float = 0.0,
+                 latency_distribution: str = "lognormal", seed: Optional[int] = None):
+        self.size = size
+        self.latency_mean = latency_mean
+        self.latency_stddev = latency_stddev
+        self.latency_distribution = latency_distribution
+        self._rng = random.Random(seed)
+
+    def _embed(self, text: str) -> List[float]:
+        digest = hashlib.sha256(text.encode("utf-8")).digest()
+        vector = np.random.default_rng(int.from_bytes(digest[:8], "little")).standard_normal(self.size)
+        return (vector / np.linalg.norm(vector)).astype("float32").tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        time.sleep(sample_latency(self._rng, self.latency_distribution, self.latency_mean, self.latency_stddev))
+        return self._embed(text)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        time.sleep(sample_latency(self._rng, self.latency_distribution, self.latency_mean, self.latency_stddev))
+        return [self._embed(text) for text in texts]
+
+
+def fake_backends_from_env() -> Tuple[FakeChatModel, FakeEmbeddings]:
+    """
+    Build fake LLM and embedding backends configured from FAKE_* environment variables.
+
+    FAKE_LLM_LATENCY_MS / FAKE_LLM_LATENCY_STDDEV_MS / FAKE_LLM_LATENCY_DISTRIBUTION,
+    FAKE_LLM_ERROR_RATE, FAKE_LLM_FENCE_RATE, FAKE_LLM_RESPONSES (path to a JSON file
+    mapping dimension name to canned output), FAKE_EMBEDDING_LATENCY_MS,
+    FAKE_EMBEDDING_SIZE and FAKE_SEED.
+    """
+    seed = os.getenv("FAKE_SEED")
+    seed = int(seed) if seed else None
+    distribution = os.getenv("FAKE_LLM_LATENCY_DISTRIBUTION", "lognormal")
+
+    responses = DEFAULT_RESPONSES
+    responses_path = os.getenv("FAKE_LLM_RESPONSES")
+    if responses_path:
+        with open(responses_path) as f:
+            responses = {**DEFAULT_RESPONSES, **json.load(f)}
+
+    llm = FakeChatModel(
+        responses=responses,
+        latency_mean=float(os.getenv("FAKE_LLM_LATENCY_MS", "0")) / 1000,
+        latency_stddev=float(os.getenv("FAKE_LLM_LATENCY_STDDEV_MS", "0")) / 1000,
+        latency_distribution=distribution,
+        error_rate=float(os.getenv("FAKE_LLM_ERROR_RATE", "0")),
+        fence_rate=float(os.getenv("FAKE_LLM_FENCE_RATE", "0")),
+        seed=seed,
+    )
+    embeddings = FakeEmbeddings(
+        size=int(os.getenv("FAKE_EMBEDDING_SIZE", "768")),
+        latency_mean=float(os.getenv("FAKE_EMBEDDING_LATENCY_MS", "0")) / 1000,
+        latency_stddev=float(os.getenv("FAKE_EMBEDDING_LATENCY_STDDEV_MS", "0")) / 1000,
+        latency_distribution=distribution,
+        seed=seed,
+    )
+    return llm, embeddings
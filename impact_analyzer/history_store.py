@@ -0,0 +1,506 @@
+import json
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS analyses (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    change_request_id TEXT NOT NULL UNIQUE,
+    created_at REAL NOT NULL,
+    change_text TEXT NOT NULL,
+    security_risk TEXT,
+    compliance_risk TEXT,
+    latency_impact TEXT,
+    throughput_impact TEXT,
+    vulnerabilities_introduced INTEGER,
+    rules_changed INTEGER,
+    fields_added INTEGER,
+    fields_modified INTEGER,
+    endpoints_modified INTEGER,
+    endpoints_added INTEGER,
+    screens_affected INTEGER,
+    components_changed INTEGER,
+    compliance_flag_count INTEGER,
+    result_json TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_analyses_created_at ON analyses (created_at);
+CREATE INDEX IF NOT EXISTS idx_analyses_security_risk_id ON analyses (security_risk, id);
+CREATE INDEX IF NOT EXISTS idx_analyses_compliance_risk_id ON analyses (compliance_risk, id);
+
+CREATE TABLE IF NOT EXISTS analysis_entities (
+    analysis_id INTEGER NOT NULL REFERENCES analyses (id) ON DELETE CASCADE,
+    entity_id TEXT NOT NULL,
+    PRIMARY KEY (entity_id, analysis_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_analysis_entities_analysis ON analysis_entities (analysis_id);
+
+CREATE TABLE IF NOT EXISTS analysis_relationships (
+    analysis_id INTEGER NOT NULL REFERENCES analyses (id) ON DELETE CASCADE,
+    relationship_type TEXT NOT NULL,
+    PRIMARY KEY (relationship_type, analysis_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_analysis_relationships_analysis ON analysis_relationships (analysis_id);
+
+-- Per-day totals for every AGGREGATE_GROUPS dimension, maintained by save() so
+-- aggregates never scan the analyses table. NULL keys are stored as ''.
+CREATE TABLE IF NOT EXISTS analysis_rollups (
+    dimension TEXT NOT NULL,
+    key TEXT NOT NULL,
+    day INTEGER NOT NULL,
+    analyses INTEGER NOT NULL,
+    rules_changed_total INTEGER,
+    fields_added_total INTEGER,
+    fields_modified_total INTEGER,
+    endpoints_modified_total INTEGER,
+    endpoints_added_total INTEGER,
+    screens_affected_total INTEGER,
+    components_changed_total INTEGER,
+    compliance_flag_count_total INTEGER,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    PRIMARY KEY (dimension, day, key)
+) WITHOUT ROWID;
+"""
+
+# Columns that may be used to group aggregate queries, mapped to the SQL that
+# produces the grouping key. Anything not listed here is rejected.
+AGGREGATE_GROUPS = {
+    "security_risk": ("a.security_risk", ""),
+    "compliance_risk": ("a.compliance_risk", ""),
+    "latency_impact": ("a.latency_impact", ""),
+    "entity": ("e.entity_id", "JOIN analysis_entities e ON e.analysis_id = a.id"),
+    "relationship": ("r.relationship_type", "JOIN analysis_relationships r ON r.analysis_id = a.id"),
+}
+
+# Numeric dimension columns summed by aggregate queries.
+COUNT_COLUMNS = [
+    "rules_changed", "fields_added", "fields_modified", "endpoints_modified",
+    "endpoints_added", "screens_affected", "components_changed", "compliance_flag_count",
+]
+
+ROLLUP_UPSERT = (
+    "INSERT INTO analysis_rollups (dimension, key, day, analyses, "
+    f"{', '.join(c + '_total' for c in COUNT_COLUMNS)}, first_seen, last_seen) "
+    f"VALUES (?, ?, ?, 1, {', '.join('?' for _ in COUNT_COLUMNS)}, ?, ?) "
+    "ON CONFLICT (dimension, day, key) DO UPDATE SET analyses = analyses + 1, "
+    + ", ".join(
+        f"{c}_total = CASE WHEN excluded.{c}_total IS NULL THEN {c}_total "
+        f"ELSE COALESCE({c}_total, 0) + excluded.{c}_total END"
+        for c in COUNT_COLUMNS
+    )
+    + ", first_seen = MIN(first_seen, excluded.first_seen), last_seen = MAX(last_seen, excluded.last_seen)"
+)
+
+DAY = 86400
+
+# Bounds for query parameters: timestamps up to the year 9999, SQLite INTEGER ids.
+MAX_TIMESTAMP = 253402300800
+MAX_ID = 2 ** 63 - 1
+
+# Canonical risk levels, and the other spellings LLMs use for them.
+RISK_LEVELS = ("critical", "high", "medium", "low", "none")
+RISK_ALIASES = {"moderate": "medium", "med": "medium", "minimal": "low", "no": "none", "n/a": "none"}
+_RISK_WORD_RE = re.compile(r"\b(critical|high|medium|moderate|low|minimal|none)\b")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def _as_int(value: Any) -> Optional[int]:
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, str):
+        try:
+            return int(value.strip())
+        except ValueError:
+            return None
+    return None
+
+
+def _as_text(value: Any) -> Optional[str]:
+    if value is None or isinstance(value, (dict, list)):
+        return None
+    return str(value)
+
+
+def normalize_text(value: Any) -> Optional[str]:
+    """
+    Lower-case and collapse whitespace, so "Minor  Increase" and "minor increase" group together.
+    """
+    text = _as_text(value)
+    if text is None:
+        return None
+    text = _SPACE_RE.sub(" ", text).strip().lower()
+    return text or None
+
+
+def normalize_level(value: Any) -> Optional[str]:
+    """
+    Map a risk level as written by the LLM ("High", "HIGH risk", "Moderate") to one
+    of RISK_LEVELS. Text that names no level is kept, lower-cased.
+    """
+    text = normalize_text(value)
+    if text is None or text in RISK_LEVELS:
+        return text
+    if text in RISK_ALIASES:
+        return RISK_ALIASES[text]
+    match = _RISK_WORD_RE.search(text)
+    if match:
+        word = match.group(1)
+        return RISK_ALIASES.get(word, word)
+    return text
+
+
+def _check_range(name: str, value: Optional[float], low: float, high: float):
+    # NaN fails both comparisons, so it is rejected too.
+    if value is not None and not low <= value <= high:
+        raise ValueError(f"'{name}' must be between {low} and {high}.")
+
+
+def _day(timestamp: float) -> int:
+    return int(timestamp // DAY)
+
+
+def _add(total: Optional[int], value: Optional[int]) -> Optional[int]:
+    # SUM() semantics: NULLs are skipped, and a group of only NULLs sums to NULL.
+    if value is None:
+        return total
+    return value if total is None else total + value
+
+
+class HistoryStore:
+    def __init__(self, db_path: str = "analysis_history.db"):
+        """
+        Store past analysis results in a SQLite database, created on first use.
+
+        Args:
+            db_path (str): Path of the SQLite database file.
+        """
+        self.db_path = db_path
+        # Serializes writes on the shared writer connection; reads never take it.
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+        self._local = threading.local()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        # Connections are opened lazily and per process, so the store can be created
+        # before a pre-forking server forks its workers.
+        if self._conn is None or self._pid != os.getpid():
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            conn.execute("PRAGMA busy_timeout=5000")
+            with conn:
+                conn.executescript(SCHEMA)
+            self._conn, self._pid = conn, os.getpid()
+        return self._conn
+
+    @property
+    def reader(self) -> sqlite3.Connection:
+        """
+        This thread's read-only connection. Under WAL, readers see the last committed
+        state without waiting for the writer, so queries never block save().
+        """
+        if self.db_path == ":memory:":
+            return self.conn  # every connection to :memory: is a separate database
+        local = self._local
+        if getattr(local, "conn", None) is None or local.pid != os.getpid():
+            with self._lock:
+                self.conn  # make sure the schema exists
+            conn = sqlite3.connect(self.db_path)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA busy_timeout=5000")
+            conn.execute("PRAGMA query_only=ON")
+            local.conn, local.pid = conn, os.getpid()
+        return local.conn
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+        local_conn = getattr(self._local, "conn", None)
+        if local_conn is not None and self._local.pid == os.getpid():
+            local_conn.close()
+        self._local.conn = None
+
+    def save(self, change_text: str, result: Dict[str, Any], created_at: Optional[float] = None) -> int:
+        """
+        Store an analysis result, normalizing its dimensions into indexed columns
+        and adding it to the daily rollups in the same transaction.
+
+        Args:
+            change_text (str): The change description that was analyzed.
+            result (dict): The result returned by SystemImpactAnalyzer.analyze.
+            created_at (float): Unix timestamp; defaults to now.
+
+        Returns:
+            int: Row id of the stored analysis.
+        """
+        summary = result.get("summary", {})
+        details = result.get("details", {})
+        func = details.get("functional_analyzer") or {}
+        data = details.get("data_impact_assessor") or {}
+        api = details.get("api_impact_assessor") or {}
+        ui = details.get("ui_impact_assessor") or {}
+        compliance = details.get("compliance_impact_assessor") or {}
+        security = details.get("security_impact_assessor") or {}
+        performance = details.get("performance_impact_assessor") or {}
+
+        flags = compliance.get("compliance_flags")
+        created_at = created_at if created_at is not None else time.time()
+        security_risk = normalize_level(security.get("risk_level"))
+        compliance_risk = normalize_level(compliance.get("risk_level"))
+        latency_impact = normalize_text(performance.get("latency_impact"))
+        counts = (
+            _as_int(func.get("rules_changed")),
+            _as_int(data.get("fields_added")),
+            _as_int(data.get("fields_modified")),
+            _as_int(api.get("endpoints_modified")),
+            _as_int(api.get("endpoints_added")),
+            _as_int(ui.get("screens_affected")),
+            _as_int(ui.get("components_changed")),
+            len(flags) if isinstance(flags, list) else None,
+        )
+        row = (
+            result["change_request_id"],
+            created_at,
+            change_text,
+            security_risk,
+            compliance_risk,
+            latency_impact,
+            normalize_text(performance.get("throughput_impact")),
+            _as_int(security.get("vulnerabilities_introduced")),
+            *counts,
+            json.dumps(result),
+        )
+        entities = set(summary.get("domain_entities_impacted", []))
+        relationships = set(summary.get("domain_relationships_impacted", []))
+        rollup_keys = [
+            ("security_risk", security_risk),
+            ("compliance_risk", compliance_risk),
+            ("latency_impact", latency_impact),
+            *(("entity", e) for e in entities),
+            *(("relationship", r) for r in relationships),
+        ]
+        day = _day(created_at)
+
+        with self._lock, self.conn:
+            cur = self.conn.execute(
+                "INSERT INTO analyses (change_request_id, created_at, change_text, security_risk, "
+                "compliance_risk, latency_impact, throughput_impact, vulnerabilities_introduced, "
+                "rules_changed, fields_added, fields_modified, endpoints_modified, endpoints_added, "
+                "screens_affected, components_changed, compliance_flag_count, result_json) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                row,
+            )
+            analysis_id = cur.lastrowid
+            self.conn.executemany(
+                "INSERT INTO analysis_entities (analysis_id, entity_id) VALUES (?, ?)",
+                [(analysis_id, e) for e in entities],
+            )
+            self.conn.executemany(
+                "INSERT INTO analysis_relationships (analysis_id, relationship_type) VALUES (?, ?)",
+                [(analysis_id, r) for r in relationships],
+            )
+            self.conn.executemany(
+                ROLLUP_UPSERT,
+                [(dimension, key or "", day, *counts, created_at, created_at) for dimension, key in rollup_keys],
+            )
+        return analysis_id
+
+    def get(self, change_request_id: str) -> Optional[Dict[str, Any]]:
+        row = self.reader.execute(
+            "SELECT result_json FROM analyses WHERE change_request_id = ?",
+            (change_request_id,),
+        ).fetchone()
+        return json.loads(row["result_json"]) if row else None
+
+    def _filters(self, entity=None, relationship=None, security_risk=None,
+                 compliance_risk=None, since=None, until=None):
+        # EXISTS probes the (name, analysis_id) primary keys per row, so the
+        # query can be driven by whichever index matches its ORDER BY.
+        clauses, params = [], []
+        if entity:
+            clauses.append(
+                "EXISTS (SELECT 1 FROM analysis_entities WHERE entity_id = ? AND analysis_id = a.id)"
+            )
+            params.append(entity)
+        if relationship:
+            clauses.append(
+                "EXISTS (SELECT 1 FROM analysis_relationships WHERE relationship_type = ? AND analysis_id = a.id)"
+            )
+            params.append(relationship)
+        if security_risk:
+            clauses.append("a.security_risk = ?")
+            params.append(normalize_level(security_risk))
+        if compliance_risk:
+            clauses.append("a.compliance_risk = ?")
+            params.append(normalize_level(compliance_risk))
+        if since is not None:
+            clauses.append("a.created_at >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("a.created_at < ?")
+            params.append(until)
+        return clauses, params
+
+    def list_analyses(self, limit: int = 50, before_id: Optional[int] = None, **filters) -> Dict[str, Any]:
+        """
+        List stored analyses, newest first, using keyset pagination.
+
+        Args:
+            limit (int): Maximum number of rows to return.
+            before_id (int): Only return rows with an id lower than this cursor.
+            **filters: entity, relationship, security_risk, compliance_risk, since, until.
+
+        Returns:
+            dict: {"items": [...], "next_cursor": id or None}
+
+        Raises:
+            ValueError: If before_id, since or until is out of range.
+        """
+        # With an entity or relationship filter, walk that table's primary key in
+        # id order instead of scanning analyses and probing for a match.
+        driver = ""
+        if filters.get("entity"):
+            driver = "analysis_entities d CROSS JOIN "
+            driver_clause, driver_param = "d.entity_id = ? AND a.id = d.analysis_id", filters.pop("entity")
+        elif filters.get("relationship"):
+            driver = "analysis_relationships d CROSS JOIN "
+            driver_clause, driver_param = "d.relationship_type = ? AND a.id = d.analysis_id", filters.pop("relationship")
+
+        _check_range("before_id", before_id, 1, MAX_ID)
+        _check_range("since", filters.get("since"), 0, MAX_TIMESTAMP)
+        _check_range("until", filters.get("until"), 0, MAX_TIMESTAMP)
+        clauses, params = self._filters(**filters)
+        order = "a.id"
+        if driver:
+            clauses.insert(0, driver_clause)
+            params.insert(0, driver_param)
+            order = "d.analysis_id"
+        if before_id is not None:
+            clauses.append(f"{order} < ?")
+            params.append(before_id)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        sql = (
+            "SELECT a.id, a.change_request_id, a.created_at, a.change_text, a.security_risk, "
+            "a.compliance_risk, a.latency_impact, a.throughput_impact, a.vulnerabilities_introduced, "
+            f"{', '.join('a.' + c for c in COUNT_COLUMNS)}, "
+            "(SELECT group_concat(entity_id) FROM analysis_entities WHERE analysis_id = a.id) AS entities, "
+            "(SELECT group_concat(relationship_type) FROM analysis_relationships WHERE analysis_id = a.id) "
+            "AS relationships "
+            f"FROM {driver}analyses a {where} ORDER BY {order} DESC LIMIT ?"
+        )
+        rows = self.reader.execute(sql, params + [limit + 1]).fetchall()
+
+        items = []
+        for row in rows[:limit]:
+            item = dict(row)
+            item["entities"] = item["entities"].split(",") if item["entities"] else []
+            item["relationships"] = item["relationships"].split(",") if item["relationships"] else []
+            items.append(item)
+        next_cursor = items[-1]["id"] if len(rows) > limit else None
+        return {"items": items, "next_cursor": next_cursor}
+
+    def aggregate(self, group_by: str, limit: int = 100, **filters) -> List[Dict[str, Any]]:
+        """
+        Count analyses and summarize dimension counts per group.
+
+        With no filters other than since/until, whole days are read from the
+        rollup table and only the partial days at either end of the range are
+        scanned. Any other filter has to scan the matching rows, so it requires
+        `since` to bound the scan.
+
+        Args:
+            group_by (str): One of AGGREGATE_GROUPS.
+            limit (int): Maximum number of groups to return.
+            **filters: Same filters accepted by list_analyses().
+
+        Returns:
+            list: One dict per group, ordered by analysis count descending.
+
+        Raises:
+            ValueError: If group_by is unsupported, since/until is out of range, or
+                an entity, relationship or risk filter is given without `since`.
+        """
+        if group_by not in AGGREGATE_GROUPS:
+            raise ValueError(f"Unsupported group_by '{group_by}'. Use one of: {', '.join(AGGREGATE_GROUPS)}")
+        since, until = filters.pop("since", None), filters.pop("until", None)
+        _check_range("since", since, 0, MAX_TIMESTAMP)
+        _check_range("until", until, 0, MAX_TIMESTAMP)
+        conn = self.reader
+
+        if any(filters.values()):
+            if since is None:
+                raise ValueError("Aggregates filtered by entity, relationship or risk require 'since'.")
+            groups = self._merge({}, self._scan(conn, group_by, since=since, until=until, **filters))
+        else:
+            first_day = math.ceil(since / DAY) if since is not None else None
+            end_day = math.floor(until / DAY) if until is not None else None
+            if first_day is not None and end_day is not None and first_day >= end_day:
+                groups = self._merge({}, self._scan(conn, group_by, since=since, until=until))
+            else:
+                groups = self._merge({}, self._rollups(conn, group_by, first_day, end_day))
+                if since is not None and since < first_day * DAY:
+                    groups = self._merge(groups, self._scan(conn, group_by, since=since, until=first_day * DAY))
+                if until is not None and until > end_day * DAY:
+                    groups = self._merge(groups, self._scan(conn, group_by, since=end_day * DAY, until=until))
+
+        rows = sorted(groups.values(), key=lambda g: g["analyses"], reverse=True)
+        return rows[:limit]
+
+    def _scan(self, conn: sqlite3.Connection, group_by: str, **filters) -> List[sqlite3.Row]:
+        # Always called with a time range; left to itself the planner prefers walking
+        # the whole (risk, id) index to get rows already grouped.
+        key, join = AGGREGATE_GROUPS[group_by]
+        clauses, params = self._filters(**filters)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        sums = ", ".join(f"SUM(a.{c}) AS {c}_total" for c in COUNT_COLUMNS)
+        sql = (
+            f"SELECT {key} AS key, COUNT(*) AS analyses, {sums}, "
+            "MIN(a.created_at) AS first_seen, MAX(a.created_at) AS last_seen "
+            f"FROM analyses a INDEXED BY idx_analyses_created_at {join} {where} GROUP BY {key}"
+        )
+        return conn.execute(sql, params).fetchall()
+
+    def _rollups(self, conn: sqlite3.Connection, group_by: str, first_day: Optional[int],
+                 end_day: Optional[int]) -> List[sqlite3.Row]:
+        clauses, params = ["dimension = ?"], [group_by]
+        if first_day is not None:
+            clauses.append("day >= ?")
+            params.append(first_day)
+        if end_day is not None:
+            clauses.append("day < ?")
+            params.append(end_day)
+        sums = ", ".join(f"SUM({c}_total) AS {c}_total" for c in COUNT_COLUMNS)
+        sql = (
+            f"SELECT NULLIF(key, '') AS key, SUM(analyses) AS analyses, {sums}, "
+            "MIN(first_seen) AS first_seen, MAX(last_seen) AS last_seen "
+            f"FROM analysis_rollups WHERE {' AND '.join(clauses)} GROUP BY key"
+        )
+        return conn.execute(sql, params).fetchall()
+
+    @staticmethod
+    def _merge(groups: Dict[Any, Dict[str, Any]], rows: Iterable[sqlite3.Row]) -> Dict[Any, Dict[str, Any]]:
+        for row in rows:
+            group = groups.get(row["key"])
+            if group is None:
+                groups[row["key"]] = dict(row)
+                continue
+            group["analyses"] += row["analyses"]
+            for c in COUNT_COLUMNS:
+                group[f"{c}_total"] = _add(group[f"{c}_total"], row[f"{c}_total"])
+            group["first_seen"] = min(group["first_seen"], row["first_seen"])
+            group["last_seen"] = max(group["last_seen"], row["last_seen"])
+        return groups
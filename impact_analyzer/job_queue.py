@@ -0,0 +1,355 @@
+import ipaddress
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Iterable, Optional
+from urllib.parse import urlsplit, urlunsplit
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    change_text TEXT NOT NULL,
+    callback_url TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker_pid INTEGER,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    result_json TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status_created_at ON jobs (status, created_at);
+"""
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+def _pid_alive(pid: Optional[int]) -> bool:
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _host_allowed(host: str, allowed_hosts: Iterable[str]) -> bool:
+    for pattern in allowed_hosts:
+        if pattern.startswith("*.") and host.endswith(pattern[1:]):
+            return True
+        if host == pattern:
+            return True
+    return False
+
+
+def check_callback_url(url: str, allowed_hosts: Iterable[str] = ()) -> Optional[str]:
+    """
+    Reject callback URLs that could be used to reach internal services.
+
+    The URL must be http(s). If allowed_hosts is non-empty its host must be listed
+    there (exact names or "*.example.com" patterns); otherwise every address the
+    host resolves to must be public, which rules out loopback, private,
+    link-local (cloud metadata) and reserved ranges.
+
+    Returns:
+        str: The checked address to connect to, or None for a listed host.
+
+    Raises:
+        ValueError: If the URL is not an allowed callback target.
+    """
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise ValueError("Callback URL must be an http(s) URL with a host.")
+    host = parts.hostname.lower().rstrip(".")
+
+    allowed_hosts = [h.strip().lower() for h in allowed_hosts if h.strip()]
+    if allowed_hosts:
+        if not _host_allowed(host, allowed_hosts):
+            raise ValueError(f"Callback host '{host}' is not in the allowed hosts.")
+        return None
+
+    try:
+        infos = socket.getaddrinfo(host, parts.port or (443 if parts.scheme == "https" else 80),
+                                   proto=socket.IPPROTO_TCP)
+    except (socket.gaierror, UnicodeError, ValueError):
+        raise ValueError(f"Callback host '{host}' does not resolve.")
+    for info in infos:
+        address = ipaddress.ip_address(info[4][0].split("%")[0])
+        if not address.is_global:
+            raise ValueError(f"Callback host '{host}' resolves to a non-public address.")
+    return str(ipaddress.ip_address(infos[0][4][0].split("%")[0]))
+
+
+def _post_callback(url: str, address: Optional[str], payload: Dict[str, Any], timeout: float):
+    """
+    POST the payload as JSON to url. Given an address, connect to it instead of
+    resolving the host again, which a short-TTL DNS record could point at an
+    internal address after the check; the Host header, TLS SNI and certificate
+    check still use the host name.
+    """
+    import requests  # only needed once a job with a callback finishes
+    from requests.adapters import HTTPAdapter
+
+    headers = {}
+    with requests.Session() as session:
+        if address:
+            parts = urlsplit(url)
+            userinfo, _, host_port = parts.netloc.rpartition("@")
+            netloc = f"[{address}]" if ":" in address else address
+            if parts.port:
+                netloc = f"{netloc}:{parts.port}"
+            if userinfo:
+                netloc = f"{userinfo}@{netloc}"
+            url = urlunsplit(parts._replace(netloc=netloc))
+            headers["Host"] = host_port
+            hostname = parts.hostname
+
+            class PinnedAdapter(HTTPAdapter):
+                def init_poolmanager(self, *args, **kwargs):
+                    # Ignored by urllib3 for plain http pools
+                    super().init_poolmanager(*args, server_hostname=hostname, **kwargs)
+
+            session.mount("http://", PinnedAdapter())
+            session.mount("https://", PinnedAdapter())
+        session.post(url, json=payload, headers=headers, timeout=timeout, allow_redirects=False)
+
+
+class JobQueue:
+    def __init__(
+        self,
+        handler: Callable[[str, str], Dict[str, Any]],
+        db_path: str = "analysis_jobs.db",
+        workers: int = 2,
+        max_attempts: int = 3,
+        poll_interval: float = 1.0,
+        callback_timeout: float = 10.0,
+        callback_allowed_hosts: Iterable[str] = (),
+    ):
+        """
+        Durable SQLite-backed job queue drained by a bounded pool of worker threads.
+
+        Args:
+            handler (callable): Function taking (job_id, change_text) and returning the analysis result.
+            db_path (str): Path of the SQLite database file holding the queue.
+            workers (int): Number of worker threads draining the queue.
+            max_attempts (int): Jobs interrupted by a restart are retried up to this many times.
+            poll_interval (float): Seconds an idle worker waits before checking the queue again.
+            callback_timeout (float): Timeout in seconds for callback URL requests.
+            callback_allowed_hosts (iterable): Hosts callbacks may be sent to; see check_callback_url.
+        """
+        self.handler = handler
+        self.db_path = db_path
+        self.workers = max(1, workers)
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+        self.callback_timeout = callback_timeout
+        self.callback_allowed_hosts = tuple(callback_allowed_hosts)
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition()
+        self._stopping = threading.Event()
+        self._threads = []
+        self._conn = None
+        self._pid = None
+        self._local = threading.local()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        # Opened lazily and per process; see HistoryStore.conn.
+        if self._conn is None or self._pid != os.getpid():
+            conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            conn.executescript(SCHEMA)
+            self._conn, self._pid = conn, os.getpid()
+        return self._conn
+
+    @property
+    def reader(self) -> sqlite3.Connection:
+        """
+        This thread's read-only connection (see HistoryStore.reader), so status polls
+        never wait for _lock, which a worker holds across BEGIN IMMEDIATE in _claim.
+        """
+        if self.db_path == ":memory:":
+            return self.conn  # every connection to :memory: is a separate database
+        local = self._local
+        if getattr(local, "conn", None) is None or local.pid != os.getpid():
+            if self._pid != os.getpid():
+                with self._lock:
+                    self.conn  # make sure the schema exists
+            conn = sqlite3.connect(self.db_path)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA busy_timeout=5000")
+            conn.execute("PRAGMA query_only=ON")
+            local.conn, local.pid = conn, os.getpid()
+        return local.conn
+
+    def start(self):
+        """
+        Requeue jobs left running by a dead process and start the worker threads.
+        Jobs claimed by sibling worker processes that are still alive are left alone.
+        """
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT id, attempts, worker_pid FROM jobs WHERE status = ?", (RUNNING,)
+            ).fetchall()
+            for row in rows:
+                # A restarted container can hand us the dead process's pid, and this
+                # process has not claimed anything yet, so our own pid counts as dead.
+                if row["worker_pid"] != os.getpid() and _pid_alive(row["worker_pid"]):
+                    continue
+                if row["attempts"] < self.max_attempts:
+                    self.conn.execute(
+                        "UPDATE jobs SET status = ?, started_at = NULL, worker_pid = NULL "
+                        "WHERE id = ? AND status = ?",
+                        (QUEUED, row["id"], RUNNING),
+                    )
+                else:
+                    self.conn.execute(
+                        "UPDATE jobs SET status = ?, finished_at = ?, error = ? WHERE id = ? AND status = ?",
+                        (FAILED, time.time(), "Job interrupted too many times.", row["id"], RUNNING),
+                    )
+
+        self._stopping.clear()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        logging.info(f"🧵 Started {self.workers} job worker(s) on '{self.db_path}'")
+
+    def stop(self, timeout: float = 5.0):
+        self._stopping.set()
+        with self._wakeup:
+            self._wakeup.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def check_callback_url(self, callback_url: str) -> Optional[str]:
+        return check_callback_url(callback_url, self.callback_allowed_hosts)
+
+    def submit(self, change_text: str, callback_url: Optional[str] = None) -> str:
+        """
+        Queue a job and return its id.
+
+        Raises:
+            ValueError: If callback_url is not an allowed callback target.
+        """
+        if callback_url:
+            self.check_callback_url(callback_url)
+        job_id = str(uuid.uuid4())
+        with self._lock:
+            self.conn.execute(
+                "INSERT INTO jobs (id, status, change_text, callback_url, created_at) VALUES (?, ?, ?, ?, ?)",
+                (job_id, QUEUED, change_text, callback_url, time.time()),
+            )
+        with self._wakeup:
+            self._wakeup.notify()
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        row = self.reader.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        return self._to_dict(row)
+
+    def _to_dict(self, row: sqlite3.Row) -> Dict[str, Any]:
+        job = {
+            "job_id": row["id"],
+            "status": row["status"],
+            "attempts": row["attempts"],
+            "created_at": row["created_at"],
+            "started_at": row["started_at"],
+            "finished_at": row["finished_at"],
+        }
+        if row["result_json"] is not None:
+            job["result"] = json.loads(row["result_json"])
+        if row["error"] is not None:
+            job["error"] = row["error"]
+        return job
+
+    def _claim(self) -> Optional[sqlite3.Row]:
+        # BEGIN IMMEDIATE takes the write lock up front, so concurrent processes
+        # sharing the same database file never claim the same job.
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self.conn.execute(
+                    "SELECT * FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1", (QUEUED,)
+                ).fetchone()
+                if row is not None:
+                    self.conn.execute(
+                        "UPDATE jobs SET status = ?, started_at = ?, attempts = attempts + 1, worker_pid = ? "
+                        "WHERE id = ?",
+                        (RUNNING, time.time(), os.getpid(), row["id"]),
+                    )
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+        return row
+
+    def _finish(self, job_id: str, status: str, result: Optional[Dict[str, Any]] = None,
+                error: Optional[str] = None):
+        with self._lock:
+            self.conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ?, result_json = ?, error = ? WHERE id = ?",
+                (status, time.time(), json.dumps(result) if result is not None else None, error, job_id),
+            )
+
+    def _send_callback(self, job_id: str, callback_url: str):
+        try:
+            # Checked again at send time, since DNS may have changed since submission,
+            # and sent to the checked address rather than resolving the host again.
+            address = self.check_callback_url(callback_url)
+            _post_callback(callback_url, address, self.get(job_id), self.callback_timeout)
+        except Exception:
+            logging.exception(f"⚠️ Callback for job {job_id} to {callback_url} failed:")
+
+    def _work(self):
+        while not self._stopping.is_set():
+            try:
+                self._work_once()
+            except Exception:
+                # Never let a database or callback error kill the worker thread.
+                logging.exception("⚠️ Job worker error:")
+                self._stopping.wait(self.poll_interval)
+
+    def _work_once(self):
+        try:
+            row = self._claim()
+        except sqlite3.OperationalError:
+            logging.exception("⚠️ Failed to claim job from queue:")
+            row = None
+
+        if row is None:
+            with self._wakeup:
+                self._wakeup.wait(self.poll_interval)
+            return
+
+        job_id = row["id"]
+        try:
+            result = self.handler(job_id, row["change_text"])
+        except Exception as e:
+            logging.exception(f"🔥 Job {job_id} failed:")
+            self._finish(job_id, FAILED, error=str(e))
+        else:
+            self._finish(job_id, SUCCEEDED, result=result)
+
+        if row["callback_url"]:
+            self._send_callback(job_id, row["callback_url"])
@@ -0,0 +1,101 @@
+import json
+import logging
+import os
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional, Tuple
+
+from prometheus_client import CollectorRegistry, Counter, Histogram, generate_latest, multiprocess
+
+
+# Stage latencies range from sub-millisecond matching to multi-second LLM calls.
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Fraction of traced operations whose span timings are logged as one JSON line.
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0"))
+
+trace_logger = logging.getLogger("impact_analyzer.trace")
+
+# Under a multi-worker server set PROMETHEUS_MULTIPROC_DIR (gunicorn.conf.py does):
+# every process then writes its samples to mmap'd files in that directory and
+# render_metrics() aggregates them, so any worker can serve /metrics for all of them.
+MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+
+REGISTRY = CollectorRegistry()
+
+STAGE_SECONDS = Histogram(
+    "impact_analyzer_stage_seconds", "Time spent in each stage of an impact analysis.",
+    ["stage"], buckets=DEFAULT_BUCKETS, registry=REGISTRY,
+)
+ANALYSES_TOTAL = Counter(
+    "impact_analyzer_analyses_total", "Analyses run, by outcome.",
+    ["status"], registry=REGISTRY,
+)
+LLM_TOKENS_TOTAL = Counter(
+    "impact_analyzer_llm_tokens_total", "LLM tokens used, by chain and direction (input/output).",
+    ["chain", "direction"], registry=REGISTRY,
+)
+PARSE_TOTAL = Counter(
+    "impact_analyzer_parse_total", "Chain outputs parsed, by dimension and outcome (ok/repaired/failed).",
+    ["dimension", "outcome"], registry=REGISTRY,
+)
+
+
+def render_metrics() -> bytes:
+    """
+    Render metrics in the Prometheus text exposition format.
+    In multiprocess mode these are the totals across all worker processes, live or exited.
+    """
+    if MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
+
+
+# Spans recorded for the trace currently being sampled, if any.
+_current_trace: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar("current_trace", default=None)
+
+
+@contextmanager
+def timed(stage: str) -> Iterator[None]:
+    """
+    Record the duration of the enclosed block under impact_analyzer_stage_seconds{stage=...}.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.labels(stage=stage).observe(elapsed)
+        spans = _current_trace.get()
+        if spans is not None:
+            spans.append((stage, elapsed))
+
+
+@contextmanager
+def trace(name: str, **attributes: str) -> Iterator[None]:
+    """
+    Time the enclosed block as stage `name` and, for a sampled fraction of calls,
+    log every span recorded inside it as a single JSON line.
+    """
+    if not TRACE_SAMPLE_RATE or random.random() >= TRACE_SAMPLE_RATE:
+        with timed(name):
+            yield
+        return
+
+    spans: List[Tuple[str, float]] = []
+    token = _current_trace.set(spans)
+    try:
+        with timed(name):
+            yield
+    finally:
+        _current_trace.reset(token)
+        trace_logger.info(json.dumps({
+            "trace": name,
+            **attributes,
+            "spans": [{"stage": stage, "ms": round(elapsed * 1000, 3)} for stage, elapsed in spans],
+        }))
+
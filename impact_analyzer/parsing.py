@@ -0,0 +1,188 @@
+import json
+import math
+import re
+from typing import Any, Dict, Iterator
+
+import orjson
+
+
+# Expected keys and types for each dimension, matching impact_analyzer.prompts.
+SCHEMAS = {
+    "functional": {"rules_changed": int, "description": str},
+    "data": {"fields_added": int, "fields_modified": int, "details": str},
+    "api": {"endpoints_modified": int, "endpoints_added": int, "description": str},
+    "ui": {"screens_affected": int, "components_changed": int, "summary": str},
+    "compliance": {"compliance_flags": list, "risk_level": str, "details": str},
+    "security": {"risk_level": str, "vulnerabilities_introduced": bool, "description": str},
+    "performance": {"latency_impact": str, "throughput_impact": str, "summary": str},
+}
+
+# Free-text explanation fields; a missing one is filled with "" instead of failing validation.
+OPTIONAL_FIELDS = {"description", "details", "summary"}
+
+_FENCE_RE = re.compile(r"```(?:json|JSON)?\s*(.*?)```", re.DOTALL)
+_INT_RE = re.compile(r"-?\d+")
+
+
+class ParseError(ValueError):
+    """Raised when chain output cannot be turned into a valid dimension result."""
+
+
+def _reject_constant(name: str):
+    raise ParseError(f"non-finite number {name}")
+
+
+# Like orjson, treat NaN/Infinity as invalid JSON rather than decoding them to floats.
+_decoder = json.JSONDecoder(parse_constant=_reject_constant)
+
+# Counts are stored as SQLite INTEGERs (signed 64-bit).
+_INT_MAX = 2 ** 63 - 1
+
+
+def output_text(output: Any) -> str:
+    """
+    Return the text of a chain result (LLMChain dict, chat message or plain string).
+    """
+    if isinstance(output, dict):
+        output = output.get("text", "")
+    content = getattr(output, "content", output)
+    return content if isinstance(content, str) else str(content)
+
+
+def iter_json_objects(text: str) -> Iterator[Dict[str, Any]]:
+    """
+    Yield every JSON object found in LLM output that may be fenced or wrapped in
+    prose: the whole text, then each fenced block, then each object embedded in the text.
+    """
+    stripped = text.strip()
+    # Fast path: the model did as asked and returned bare JSON.
+    if stripped.startswith("{"):
+        try:
+            value = orjson.loads(stripped)
+            if isinstance(value, dict):
+                yield value
+                return
+        except orjson.JSONDecodeError:
+            pass
+
+    candidates = [m.group(1).strip() for m in _FENCE_RE.finditer(stripped)] + [stripped]
+    for candidate in candidates:
+        start = candidate.find("{")
+        while start != -1:
+            try:
+                value, _ = _decoder.raw_decode(candidate, start)
+                if isinstance(value, dict):
+                    yield value
+            except ValueError:  # JSONDecodeError, or a rejected non-finite constant
+                pass
+            except RecursionError:
+                # Nested deeper than the interpreter allows; every later start inside
+                # the same object would fail the same way, so give up on this candidate.
+                break
+            start = candidate.find("{", start + 1)
+
+
+def extract_json_object(text: str) -> Dict[str, Any]:
+    """
+    Extract the first JSON object from LLM output that may be fenced or wrapped in prose.
+
+    Raises:
+        ParseError: If no JSON object can be found.
+    """
+    for value in iter_json_objects(text):
+        return value
+    raise ParseError("No JSON object found in output")
+
+
+def _coerce(value: Any, expected: type) -> Any:
+    if isinstance(value, float) and not math.isfinite(value):
+        raise ParseError(f"non-finite number {value}")
+    if expected is int:
+        if isinstance(value, bool):
+            return int(value)
+        if isinstance(value, (int, float)):
+            return _bounded(int(value))
+        if isinstance(value, str):
+            match = _INT_RE.search(value)
+            if match:
+                return _bounded(int(match.group()))
+        if isinstance(value, list):
+            return len(value)
+    elif expected is bool:
+        if isinstance(value, bool):
+            return value
+        if isinstance(value, (int, float)):
+            return bool(value)
+        if isinstance(value, str) and value.strip().lower() in ("true", "yes", "y", "1"):
+            return True
+        if isinstance(value, str) and value.strip().lower() in ("false", "no", "n", "0", "none"):
+            return False
+    elif expected is list:
+        if isinstance(value, list):
+            return value
+        if value is None:
+            return []
+        if isinstance(value, str):
+            return [value] if value.strip() else []
+    elif expected is str:
+        if isinstance(value, str):
+            return value
+        if isinstance(value, (int, float, bool)):
+            return str(value)
+    raise ParseError(f"expected {expected.__name__}, got {type(value).__name__}")
+
+
+def _bounded(value: int) -> int:
+    if abs(value) > _INT_MAX:
+        raise ParseError(f"integer {value} out of range")
+    return value
+
+
+def validate(dimension: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Check a parsed object against the dimension's schema, coercing field types.
+    Unknown keys are kept as-is.
+
+    Raises:
+        ParseError: If a required field is missing or cannot be coerced.
+    """
+    result = dict(data)
+    for field, expected in SCHEMAS[dimension].items():
+        if field not in data:
+            if field in OPTIONAL_FIELDS:
+                result[field] = ""
+                continue
+            raise ParseError(f"missing field '{field}'")
+        try:
+            result[field] = _coerce(data[field], expected)
+        except ParseError as e:
+            raise ParseError(f"field '{field}': {e}")
+    return result
+
+
+def parse_dimension(dimension: str, output: Any) -> Dict[str, Any]:
+    """
+    Parse and validate one chain's output. When it contains several JSON objects
+    (e.g. an example before the real answer), the first one that validates wins.
+
+    Args:
+        dimension (str): One of SCHEMAS.
+        output: The chain result.
+
+    Returns:
+        dict: The validated result.
+
+    Raises:
+        ParseError: If the output is not a valid result for the dimension.
+    """
+    error = None
+    for value in iter_json_objects(output_text(output)):
+        try:
+            return validate(dimension, value)
+        except ParseError as e:
+            error = error or e
+    raise error or ParseError("No JSON object found in output")
+
+
+def describe_schema(dimension: str) -> str:
+    return "\n".join(f"- {field} ({expected.__name__})" for field, expected in SCHEMAS[dimension].items())
@@ -146,3 +146,15 @@ performance_prompt = PromptTemplate(
     )
 )
 
+
+repair_prompt = PromptTemplate(
+    input_variables=["schema", "output", "error"],
+    template=(
+        "The following response was supposed to be a single JSON object but could not be used.\n"
+        "Problem: {error}\n\n"
+        "Response:\n{output}\n\n"
+        "Rewrite it as a JSON object with exactly these keys and types, keeping the original meaning:\n"
+        "{schema}\n\n"
+        "Return *only* the JSON object, with no markdown fences or extra text."
+    )
+)
@@ -0,0 +1,68 @@
+import pytest
+
+from impact_analyzer.parsing import ParseError, extract_json_object, iter_json_objects, parse_dimension
+
+FUNCTIONAL = '{"rules_changed": 2, "description": "Two underwriting rules change"}'
+
+
+def test_bare_json():
+    assert parse_dimension("functional", FUNCTIONAL)["rules_changed"] == 2
+
+
+def test_fenced_output():
+    text = f"Here is the assessment:\n```json\n{FUNCTIONAL}\n```\nLet me know if you need more."
+    assert parse_dimension("functional", text)["rules_changed"] == 2
+
+
+def test_prose_prefixed_output():
+    text = f"Sure! Based on the change request, the result is {FUNCTIONAL} as requested."
+    assert parse_dimension("functional", text)["description"] == "Two underwriting rules change"
+
+
+def test_chain_output_dict():
+    assert parse_dimension("functional", {"text": FUNCTIONAL})["rules_changed"] == 2
+
+
+@pytest.mark.parametrize("constant", ["NaN", "Infinity", "-Infinity"])
+def test_non_finite_numbers_rejected(constant):
+    with pytest.raises(ParseError):
+        parse_dimension("functional", f'{{"rules_changed": {constant}, "description": ""}}')
+
+
+@pytest.mark.parametrize("value", ["1e400", str(2 ** 63), f'"{-(2 ** 64)} rules"'])
+def test_out_of_range_ints_rejected(value):
+    with pytest.raises(ParseError, match="rules_changed"):
+        parse_dimension("functional", f'{{"rules_changed": {value}, "description": ""}}')
+
+
+def test_int_coerced_from_text():
+    assert parse_dimension("functional", '{"rules_changed": "3 rules", "description": ""}')["rules_changed"] == 3
+
+
+def test_example_before_answer():
+    text = (
+        'Respond in this format: {"rules_changed": "<number>", "description": "..."}\n'
+        'Answer: {"rules_changed": 4, "description": "Four rules"}'
+    )
+    assert parse_dimension("functional", text) == {"rules_changed": 4, "description": "Four rules"}
+
+
+def test_first_error_reported_when_nothing_validates():
+    with pytest.raises(ParseError, match="missing field 'rules_changed'"):
+        parse_dimension("functional", '{"description": "no count"} {"other": 1}')
+
+
+def test_missing_optional_field_filled():
+    assert parse_dimension("functional", '{"rules_changed": 1}')["description"] == ""
+
+
+def test_no_json_object():
+    with pytest.raises(ParseError, match="No JSON object"):
+        extract_json_object("I could not assess this change.")
+
+
+@pytest.mark.parametrize("text", ['{"a":' * 50000, "```json\n" + '{"a": [' * 50000 + "\n```"])
+def test_deeply_nested_input(text):
+    assert list(iter_json_objects(text)) == []
+    with pytest.raises(ParseError):
+        parse_dimension("functional", text)